@@ -1,5 +1,9 @@
+import asyncio
+import atexit
 import os
+from concurrent.futures import ThreadPoolExecutor
 import gradio as gr
+import httpx
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -7,25 +11,71 @@ load_dotenv()
 from smolagents import InferenceClientModel, CodeAgent, MCPClient
 
 
-try:
+# Number of chat turns answered at the same time.
+CHAT_CONCURRENCY = 16
 
+
+def mcp_http_client(
+    headers: dict[str, str] | None = None,
+    timeout: httpx.Timeout | None = None,
+    auth: httpx.Auth | None = None,
+) -> httpx.AsyncClient:
+    """Creates the HTTP client for the MCP SSE connection with explicit timeouts and pool limits."""
+    return httpx.AsyncClient(
+        headers=headers,
+        timeout=timeout or httpx.Timeout(30.0, connect=5.0),
+        auth=auth,
+        follow_redirects=True,
+        limits=httpx.Limits(max_connections=50, max_keepalive_connections=10, keepalive_expiry=30.0),
+    )
+
+
+def answer(message: str) -> str:
+    """Answers one chat message with its own agent, so messages can be answered in parallel."""
+    agent = CodeAgent(tools=[*tools], model=model, additional_authorized_imports=["json", "ast", "urllib", "base64"])
+    return str(agent.run(message))
+
+
+# Connecting to the MCP server and creating the model only has to happen once.
+# In reload mode (`gradio app.py`) they are kept across reloads of this file.
+if gr.NO_RELOAD:
     mcp_client = MCPClient(
-        {"url": "http://localhost:7860/gradio_api/mcp/sse"}
+        {
+            "url": "http://localhost:7860/gradio_api/mcp/sse",
+            # Fail fast when the MCP server is unreachable and give up on the SSE
+            # stream when it stays silent, instead of hanging every chat turn.
+            "timeout": 5.0,
+            "sse_read_timeout": 30.0,
+            "httpx_client_factory": mcp_http_client,
+        }
     )
-    
+
+    # Close the connection once, when the process exits, so it stays open for as
+    # long as the app serves requests.
+    atexit.register(mcp_client.disconnect)
+
     tools = mcp_client.get_tools()
 
     model = InferenceClientModel(token=os.getenv("HUGGINGFACE_API_TOKEN"))
-    agent = CodeAgent(tools=[*tools], model=model, additional_authorized_imports=["json", "ast", "urllib", "base64"])
 
-    demo = gr.ChatInterface(
-        fn=lambda message, history: str(agent.run(message)),
-        type="messages",
-        examples=["Analyze the sentiment of the following text 'This is awesome'"],
-        title="Agent with MCP Tools",
-        description="This is a simple agent that uses MCP tools to answer questions.",
-    )
+    # Threads that run agent.run. The default executor has only min(32, cpus + 4)
+    # threads, fewer than CHAT_CONCURRENCY on small hosts, so use one of our own.
+    executor = ThreadPoolExecutor(max_workers=CHAT_CONCURRENCY, thread_name_prefix="agent")
+
+
+async def chat(message, history):
+    # agent.run blocks, so answer the message in a worker thread.
+    return await asyncio.get_running_loop().run_in_executor(executor, answer, message)
+
+
+demo = gr.ChatInterface(
+    fn=chat,
+    type="messages",
+    # Let concurrent chats run side by side instead of queueing one at a time.
+    concurrency_limit=CHAT_CONCURRENCY,
+    examples=["Analyze the sentiment of the following text 'This is awesome'"],
+    title="Agent with MCP Tools",
+    description="This is a simple agent that uses MCP tools to answer questions.",
+)
 
-    demo.launch()
-finally:
-    mcp_client.disconnect()
\ No newline at end of file
+demo.launch()
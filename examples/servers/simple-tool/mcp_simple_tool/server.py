@@ -2,65 +2,395 @@
 # click is used to create a command-line interface.
 # mcp.types provides the data structures for the Model Context Protocol.
 # mcp.server.lowlevel.Server is the core class for creating an MCP server.
-# mcp.shared._httpx_utils provides a utility to create an HTTP client.
+import asyncio
+import importlib.util
+import ipaddress
+import socket
+from collections.abc import Awaitable, Callable
+from types import MappingProxyType
+from urllib.parse import urlsplit
+
 import click
 import httpx
 import mcp.types as types
+from cachetools import TTLCache
 from mcp.server.lowlevel import Server
-from mcp.shared._httpx_utils import create_mcp_http_client
 
-# Core function to fetch website content.
-async def fetch_website(
+# uvloop is not available everywhere (uvicorn[standard] skips it on Windows,
+# Cygwin and PyPy), so the stock asyncio loop is used when it is missing.
+_USE_UVLOOP = importlib.util.find_spec("uvloop") is not None
+
+# Largest response body, in characters of decoded text, that a single fetch
+# will return. Counted after decompression so compressed bodies cannot exceed it.
+MAX_CHARS = 10_000_000
+
+# User-Agent header identifying this server to the websites it fetches. It is
+# read-only so the headers set on the shared client cannot be changed by mistake.
+_HEADERS = MappingProxyType(
+    {"User-Agent": "MCP Test Server (github.com/modelcontextprotocol/python-sdk)"}
+)
+
+# Shared HTTP client, created on first use and reused for the lifetime of the
+# process so that repeated fetches reuse pooled keep-alive connections instead
+# of paying a fresh TCP + TLS handshake on every tool call.
+_http_client: httpx.AsyncClient | None = None
+
+
+async def get_client() -> httpx.AsyncClient:
+    """
+    Returns the shared HTTP client, creating it on first use.
+
+    Returns:
+        The process-wide httpx.AsyncClient used for all website fetches.
+    """
+    global _http_client
+    if _http_client is None:
+        _http_client = httpx.AsyncClient(
+            # Set a User-Agent header to identify the client making the request.
+            headers=_HEADERS,
+            # Negotiate HTTP/2 via ALPN on TLS connections so concurrent fetches
+            # to the same host multiplex over one connection. Plain http://
+            # URLs keep using HTTP/1.1.
+            http2=True,
+            # Match the MCP client defaults of following redirects.
+            follow_redirects=True,
+            # Bound the connection pool and keep idle connections warm for reuse.
+            limits=httpx.Limits(
+                max_connections=100,
+                max_keepalive_connections=20,
+                keepalive_expiry=30.0,
+            ),
+            timeout=httpx.Timeout(30.0, connect=5.0),
+            # Check every request, including each redirect hop, against the URL
+            # rules, so a public URL cannot redirect the fetch to a private host.
+            event_hooks={"request": [_check_request]},
+        )
+    return _http_client
+
+
+async def close_client() -> None:
+    """Closes the shared HTTP client, if one was created."""
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
+
+# Total number of characters kept in the response cache. Large enough to hold
+# several bodies of MAX_CHARS at once.
+CACHE_MAX_CHARS = 5 * MAX_CHARS
+
+
+def _content_size(content: list[types.ContentBlock]) -> int:
+    """Returns the number of text characters held in the given content."""
+    return sum(
+        len(block.text) for block in content if isinstance(block, types.TextContent)
+    )
+
+
+# Recently fetched website content keyed by tool name and URL, so that repeated
+# requests for the same page within the TTL are answered without a network call.
+# Entries are weighted by their size, so the cache holds at most CACHE_MAX_CHARS
+# characters.
+_url_cache: TTLCache[tuple[str, str], list[types.ContentBlock]] = TTLCache(
+    maxsize=CACHE_MAX_CHARS, ttl=300, getsizeof=_content_size
+)
+
+# Fetches currently in progress keyed by tool name and URL. Concurrent calls of
+# the same tool for the same URL await the pending task instead of issuing their
+# own request.
+_inflight: dict[tuple[str, str], asyncio.Task[list[types.ContentBlock]]] = {}
+
+
+def _cacheable(response: httpx.Response) -> bool:
+    """
+    Tells whether content read from a response may be stored in the cache.
+
+    Args:
+        response: The HTTP response the content was read from.
+
+    Returns:
+        False if the server asked for the response never to be stored.
+    """
+    return "no-store" not in response.headers.get("Cache-Control", "").lower()
+
+
+def _check_host(host: str) -> None:
+    """
+    Checks that a host is neither localhost nor a non-public IP address.
+
+    Args:
+        host: The host name or IP address taken from a URL.
+
+    Raises:
+        ValueError: If the host is localhost or a private, loopback, link-local
+            or otherwise non-public IP address.
+    """
+    name = host.rstrip(".").lower()
+    if name == "localhost" or name.endswith(".localhost"):
+        raise ValueError(f"Refusing to fetch non-public host: {host}")
+    try:
+        address = ipaddress.ip_address(name)
+    except ValueError:
+        # inet_aton also accepts the short and numeric IPv4 forms the resolver
+        # understands, such as "127.1", "2130706433" and "0x7f000001".
+        try:
+            address = ipaddress.IPv4Address(socket.inet_aton(name))
+        except OSError:
+            # A host name rather than an IP address.
+            return
+    if isinstance(address, ipaddress.IPv6Address) and address.ipv4_mapped:
+        address = address.ipv4_mapped
+    if not address.is_global:
+        raise ValueError(f"Refusing to fetch non-public host: {host}")
+
+
+def _validate_url(url: object) -> str:
+    """
+    Checks that a URL is an absolute http(s) URL pointing at a public host.
+
+    Host names are not resolved, so a name that resolves to a private address
+    is not detected.
+
+    Args:
+        url: The 'url' argument received from the client.
+
+    Returns:
+        The URL, unchanged.
+
+    Raises:
+        ValueError: If the URL is malformed, uses another scheme, or targets
+            localhost or a private, loopback or otherwise non-public address.
+    """
+    if not isinstance(url, str):
+        raise ValueError("Argument 'url' must be a string")
+    parts = urlsplit(url)
+    if parts.scheme not in ("http", "https") or not parts.hostname:
+        raise ValueError(f"Invalid URL: {url}")
+    # Refuse to fetch from the machine the server runs on or its private network.
+    _check_host(parts.hostname)
+    return url
+
+
+async def _check_request(request: httpx.Request) -> None:
+    """
+    Validates each outgoing request, including every redirect hop.
+
+    Args:
+        request: The request the shared client is about to send.
+
+    Raises:
+        ValueError: If the request URL fails _validate_url.
+    """
+    _validate_url(str(request.url))
+
+
+# Core function to fetch website content. Both the 'fetch' and the
+# 'fetch_web_content_via_ssl' tools are served by it.
+async def _fetch(
     url: str,
-    ) -> list[types.ContentBlock]:
+    client: httpx.AsyncClient,
+    ) -> tuple[list[types.ContentBlock], bool]:
     """
     Fetches the content of a website for a given URL.
 
     Args:
         url: The URL of the website to fetch.
+        client: The HTTP client to issue the request with.
 
     Returns:
-        A list containing a single TextContent block with the website's text content.
-    """
-    # Set a User-Agent header to identify the client making the request.
-    headers = {
-        "User-Agent": "MCP Test Server (github.com/modelcontextprotocol/python-sdk)"
-    }
-    # Create an MCP HTTP client with the specified headers.
-    async with create_mcp_http_client(headers=headers) as client:
-        # Make an asynchronous GET request to the URL.
-        response = await client.get(url)
+        A list containing a single TextContent block with the website's text
+        content, and whether that content may be cached.
+
+    Raises:
+        ValueError: If the decoded response body is longer than MAX_CHARS.
+    """
+    # Stream the response so the body is decoded incrementally and never
+    # buffered beyond MAX_CHARS.
+    async with client.stream("GET", url) as response:
         # Raise an exception if the request returned an HTTP error status.
         response.raise_for_status()
-        # Return the response text wrapped in a TextContent block.
-        return [types.TextContent(type="text", text=response.text)]
+        chunks: list[str] = []
+        total = 0
+        async for chunk in response.aiter_text(chunk_size=65536):
+            # Stop as soon as the decoded body exceeds the limit.
+            total += len(chunk)
+            if total > MAX_CHARS:
+                raise ValueError(
+                    f"Response too large (limit is {MAX_CHARS} characters)"
+                )
+            chunks.append(chunk)
+    # Wrap the response text in a TextContent block.
+    content: list[types.ContentBlock] = [
+        types.TextContent(type="text", text="".join(chunks))
+    ]
+    return content, _cacheable(response)
+
+
+async def _fetch_and_cache(
+    key: tuple[str, str],
+    handler: Callable[
+        [str, httpx.AsyncClient], Awaitable[tuple[list[types.ContentBlock], bool]]
+    ],
+    client: httpx.AsyncClient,
+) -> list[types.ContentBlock]:
+    """
+    Runs a tool handler and caches its content, if the handler allows it.
 
+    Args:
+        key: The tool name and URL to cache the content under.
+        handler: The function serving the tool.
+        client: The HTTP client to issue the request with.
+
+    Returns:
+        The content returned by the handler.
+    """
+    content, cacheable = await handler(key[1], client)
+    if cacheable:
+        # Remember the result for subsequent calls of this tool with the same URL.
+        _url_cache[key] = content
+    return content
 
-# Core function to fetch website content using a secure SSL connection.
-async def fetch_website_via_ssl(
+
+async def _fetch_once(
+    name: str,
     url: str,
-    ) -> list[types.ContentBlock]:
+    handler: Callable[
+        [str, httpx.AsyncClient], Awaitable[tuple[list[types.ContentBlock], bool]]
+    ],
+) -> list[types.ContentBlock]:
     """
-    Fetches the content of a website for a given URL using a secure SSL connection.
+    Calls a tool for a URL, sharing one request between concurrent callers.
+
+    The call runs in its own task rather than in the first caller's, and every
+    caller awaits it through asyncio.shield. A cancelled caller therefore only
+    stops waiting; the call carries on for everyone else.
 
     Args:
+        name: The name of the tool being called.
         url: The URL of the website to fetch.
+        handler: The function serving the tool.
 
     Returns:
-        A list containing a single TextContent block with the website's text content.
-    """
-    # Set a User-Agent header to identify the client making the request.
-    headers = {
-        "User-Agent": "MCP Test Server (github.com/modelcontextprotocol/python-sdk)"
-    }
-    # Create an MCP HTTP client with the specified headers.
-    async with httpx.AsyncClient(headers=headers) as client:
-        # Make an asynchronous GET request to the URL.
-        response = await client.get(url)
-        # Raise an exception if the request returned an HTTP error status.
-        response.raise_for_status()
-        # Return the response text wrapped in a TextContent block.
-        return [types.TextContent(type="text", text=response.text)]
+        The content returned by the handler.
+    """
+    key = (name, url)
+    task = _inflight.get(key)
+    if task is None:
+        # Fetch through the shared, connection-pooled client.
+        task = asyncio.ensure_future(
+            _fetch_and_cache(key, handler, await get_client())
+        )
+        _inflight[key] = task
+
+        def forget(done: asyncio.Task[list[types.ContentBlock]]) -> None:
+            if _inflight.get(key) is done:
+                del _inflight[key]
+            # Mark a failure as retrieved in case every caller was cancelled.
+            if not done.cancelled():
+                done.exception()
+
+        task.add_done_callback(forget)
+    return await asyncio.shield(task)
+
+
+# Maps each tool name to the function that serves it. Used both to validate the
+# requested tool and to dispatch the call. A handler returns its content and
+# whether that content may be cached; results are cached per tool and URL.
+_TOOLS: dict[
+    str,
+    Callable[
+        [str, httpx.AsyncClient], Awaitable[tuple[list[types.ContentBlock], bool]]
+    ],
+] = {
+    "fetch": _fetch,
+    "fetch_web_content_via_ssl": _fetch,
+}
+
+
+# The tool definitions advertised to clients. They never change, so they are
+# built once at import time and returned as-is from list_tools().
+_TOOLS_RESPONSE: list[types.Tool] = [
+    types.Tool(
+        name="fetch",
+        title="Website Fetcher",
+        description="Fetches a website and returns its content",
+        # Defines the expected input schema for the 'fetch' tool.
+        inputSchema={
+            "type": "object",
+            "required": ["url"],
+            "properties": {
+                "url": {
+                    "type": "string",
+                    "description": "URL to fetch",
+                },
+                "force_refresh": {
+                    "type": "boolean",
+                    "description": "Bypass the response cache and fetch the URL again",
+                    "default": False,
+                },
+            },
+        },
+    ),
+    types.Tool(
+        name="fetch_web_content_via_ssl",
+        title="Website Fetcher via SSL",
+        description="Fetches a website and returns its content using a secure SSL connection",
+        # Defines the expected input schema for the 'fetch_web_content_via_ssl' tool.
+        inputSchema={
+            "type": "object",
+            "required": ["url"],
+            "properties": {
+                "url": {
+                    "type": "string",
+                    "description": "URL to fetch over SSL",
+                },
+                "force_refresh": {
+                    "type": "boolean",
+                    "description": "Bypass the response cache and fetch the URL again",
+                    "default": False,
+                },
+            },
+        },
+    ),
+]
+
+
+async def _call_tool(name: str, arguments: dict) -> list[types.ContentBlock]:
+    """
+    Validates a tool call and serves it from the cache or the network.
+
+    Args:
+        name: The name of the tool being called.
+        arguments: A dictionary of arguments for the tool.
+
+    Returns:
+        The content fetched from the website.
+
+    Raises:
+        ValueError: If the tool name is unknown, arguments are missing or the
+            URL is invalid.
+    """
+    # Look up the function serving the requested tool.
+    handler = _TOOLS.get(name)
+    if handler is None:
+        raise ValueError(f"Unknown tool: {name}")
+
+    # Validate that the required 'url' argument is provided.
+    if "url" not in arguments:
+        raise ValueError("Missing required argument 'url'")
+
+    # Reject malformed or non-public URLs before touching the cache or network.
+    url = _validate_url(arguments["url"])
+
+    # Serve recently fetched content from the cache unless a refresh is forced.
+    if not arguments.get("force_refresh", False):
+        cached = _url_cache.get((name, url))
+        if cached is not None:
+            return cached
+
+    # Share the fetch with identical calls that are already in progress.
+    return await _fetch_once(name, url, handler)
 
 
 # Defines a command-line interface for the server using click.
@@ -73,15 +403,39 @@ async def fetch_website_via_ssl(
     default="stdio",
     help="Transport type",
 )
+# Adds '--ssl-keyfile' and '--ssl-certfile' options to serve SSE over TLS.
+@click.option("--ssl-keyfile", default=None, help="TLS private key file for SSE")
+@click.option("--ssl-certfile", default=None, help="TLS certificate file for SSE")
 
-def main(port: int, transport: str) -> int:
+def main(
+    port: int,
+    transport: str,
+    ssl_keyfile: str | None,
+    ssl_certfile: str | None,
+) -> int:
     """
     Main function to set up and run the MCP server.
 
     Args:
         port: The port number for the SSE server.
         transport: The communication transport to use ('stdio' or 'sse').
+        ssl_keyfile: Optional TLS private key used to serve SSE over HTTPS.
+        ssl_certfile: Optional TLS certificate used to serve SSE over HTTPS.
+
+    Raises:
+        click.UsageError: If only one of the TLS options is given, or they are
+            given with the stdio transport.
     """
+    # Check the TLS options here rather than letting uvicorn fail on them later.
+    if (ssl_keyfile is None) != (ssl_certfile is None):
+        raise click.UsageError(
+            "--ssl-keyfile and --ssl-certfile must be given together"
+        )
+    if ssl_keyfile is not None and transport != "sse":
+        raise click.UsageError(
+            "--ssl-keyfile and --ssl-certfile require --transport sse"
+        )
+
     # Initialize the MCP Server with a unique name for identification.
     app = Server("mcp-website-fetcher")
 
@@ -99,63 +453,21 @@ def main(port: int, transport: str) -> int:
             The content fetched from the website.
         
         Raises:
-            ValueError: If the tool name is unknown or arguments are missing.
+            ValueError: If the tool name is unknown, arguments are missing or the
+                URL is invalid.
         """
-        # Ensure the correct tool is being called.
-        if name not in ["fetch", "fetch_web_content_via_ssl"]:
-            raise ValueError(f"Unknown tool: {name}")
-        
-        # Validate that the required 'url' argument is provided.
-        if "url" not in arguments:
-            raise ValueError("Missing required argument 'url'")
-        
-        # Use the helper function to perform the website fetch.
-        if name == "fetch":
-            return await fetch_website(arguments["url"])
-        elif name == "fetch_web_content_via_ssl":
-            return await fetch_website_via_ssl(arguments["url"])
+        return await _call_tool(name, arguments)
 
     # Registers a function to list the tools available on this server.
     @app.list_tools()
     async def list_tools() -> list[types.Tool]:
         """Returns the list of tools that this server provides."""
-        return [
-            types.Tool(
-                name="fetch",
-                title="Website Fetcher",
-                description="Fetches a website and returns its content",
-                # Defines the expected input schema for the 'fetch' tool.
-                inputSchema={
-                    "type": "object",
-                    "required": ["url"],
-                    "properties": {
-                        "url": {
-                            "type": "string",
-                            "description": "URL to fetch",
-                        }
-                    },
-                },
-            ),
-            types.Tool(
-                name="fetch_web_content_via_ssl",
-                title="Website Fetcher via SSL",
-                description="Fetches a website and returns its content using a secure SSL connection",
-                # Defines the expected input schema for the 'fetch_web_content_via_ssl' tool.
-                inputSchema={
-                    "type": "object",
-                    "required": ["url"],
-                    "properties": {
-                        "url": {
-                            "type": "string",
-                            "description": "URL to fetch over SSL",
-                        }
-                    },
-                },
-            )
-        ]
+        return _TOOLS_RESPONSE
 
     # Depending on the chosen transport, configure and run the server.
     if transport == "sse":
+        from contextlib import asynccontextmanager
+
         # Import uvicorn to run the ASGI application.
         import uvicorn
         # SSE (Server-Sent Events) is used for communication over HTTP, suitable for web clients.
@@ -180,11 +492,20 @@ def main(port: int, transport: str) -> int:
                 )
             return Response()
 
+        @asynccontextmanager
+        async def lifespan(_app: Starlette):
+            """Closes the shared HTTP client when the web server shuts down."""
+            try:
+                yield
+            finally:
+                await close_client()
+
         # Create a Starlette web application to handle HTTP requests.
         # When a client sends a GET request to /sse, the 
         # handle_sse function is called to open the SSE connection.
         starlette_app = Starlette(
             debug=True,
+            lifespan=lifespan,
             routes=[
                 # Route for establishing the SSE connection.
                 Route("/sse", endpoint=handle_sse, methods=["GET"]),
@@ -193,8 +514,18 @@ def main(port: int, transport: str) -> int:
             ],
         )
 
-        # Run the Starlette app using uvicorn.
-        uvicorn.run(starlette_app, host="127.0.0.1", port=port)
+        # Run the Starlette app using uvicorn, on the libuv-based uvloop event
+        # loop (when installed) and the httptools HTTP parser rather than the
+        # pure-Python defaults.
+        uvicorn.run(
+            starlette_app,
+            host="127.0.0.1",
+            port=port,
+            loop="uvloop" if _USE_UVLOOP else "asyncio",
+            http="httptools",
+            ssl_keyfile=ssl_keyfile,
+            ssl_certfile=ssl_certfile,
+        )
     else:
         # Import anyio to run the server.
         import anyio
@@ -206,14 +537,21 @@ def main(port: int, transport: str) -> int:
 
         async def arun():
             """Runs the server using standard I/O."""
-            # Create a stdio server to handle input and output streams.
-            async with stdio_server() as streams:
-                # Run the MCP application with the stdio streams.
-                await app.run(
-                    streams[0], streams[1], app.create_initialization_options()
-                )
+            try:
+                # Create a stdio server to handle input and output streams.
+                async with stdio_server() as streams:
+                    # Run the MCP application with the stdio streams.
+                    await app.run(
+                        streams[0], streams[1], app.create_initialization_options()
+                    )
+            finally:
+                # Release pooled connections held by the shared HTTP client.
+                await close_client()
         
-        # Start the asynchronous event loop for the stdio server.
-        anyio.run(arun)
+        # Start the asynchronous event loop for the stdio server, backed by uvloop
+        # when it is installed.
+        anyio.run(
+            arun, backend="asyncio", backend_options={"use_uvloop": _USE_UVLOOP}
+        )
 
     return 0
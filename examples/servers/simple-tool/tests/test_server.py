@@ -0,0 +1,243 @@
+import asyncio
+import gzip
+
+import httpx
+import pytest
+from click.testing import CliRunner
+
+import mcp_simple_tool.server as server
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture(autouse=True)
+async def reset_state():
+    server._url_cache.clear()
+    yield
+    await server.close_client()
+    server._url_cache.clear()
+
+
+async def test_shared_client_enables_http2(monkeypatch):
+    created = []
+    original = httpx.AsyncClient
+
+    def spy(**kwargs):
+        created.append(kwargs)
+        return original(**kwargs)
+
+    monkeypatch.setattr(server.httpx, "AsyncClient", spy)
+
+    client = await server.get_client()
+
+    assert created[0]["http2"] is True
+    assert await server.get_client() is client
+    assert len(created) == 1
+
+
+@pytest.fixture
+def serve(monkeypatch):
+    """Routes the shared client's requests to an in-process handler."""
+    original = httpx.AsyncClient
+
+    def install(handler):
+        def factory(**kwargs):
+            return original(transport=httpx.MockTransport(handler), **kwargs)
+
+        monkeypatch.setattr(server.httpx, "AsyncClient", factory)
+
+    return install
+
+
+@pytest.mark.parametrize(
+    "url",
+    [
+        "ftp://example.com/",
+        "http://",
+        "http://localhost/",
+        "http://localhost./",
+        "http://127.0.0.1/",
+        "http://127.1/",
+        "http://2130706433/",
+        "http://0x7f000001/",
+        "http://10.0.0.1/",
+        "http://169.254.169.254/",
+        "http://[::1]/",
+        "http://[::ffff:192.168.0.1]/",
+    ],
+)
+async def test_validate_url_rejects_non_public_urls(url):
+    with pytest.raises(ValueError):
+        server._validate_url(url)
+
+
+async def test_validate_url_accepts_public_urls():
+    assert server._validate_url("https://example.com/a") == "https://example.com/a"
+    assert server._validate_url("http://93.184.216.34/") == "http://93.184.216.34/"
+
+
+async def test_fetch_rejects_redirect_to_private_host(serve):
+    def handler(request):
+        if request.url.host == "public.example":
+            return httpx.Response(
+                302, headers={"Location": "http://169.254.169.254/latest/meta-data/"}
+            )
+        return httpx.Response(200, text="secret")
+
+    serve(handler)
+
+    with pytest.raises(ValueError):
+        await server._fetch("http://public.example/", await server.get_client())
+
+
+async def test_fetch_caps_decoded_size_of_compressed_body(serve, monkeypatch):
+    monkeypatch.setattr(server, "MAX_CHARS", 1_000)
+    body = gzip.compress(b"x" * 100_000)
+
+    def handler(request):
+        return httpx.Response(
+            200,
+            content=body,
+            headers={"Content-Encoding": "gzip", "Content-Length": str(len(body))},
+        )
+
+    serve(handler)
+
+    with pytest.raises(ValueError):
+        await server._fetch("http://public.example/", await server.get_client())
+
+
+async def test_fetch_once_shares_one_fetch_between_callers():
+    calls = []
+    release = asyncio.Event()
+
+    async def handler(url, client):
+        calls.append(url)
+        await release.wait()
+        return ["page"], False
+
+    first = asyncio.ensure_future(server._fetch_once("fetch", "https://example.com/", handler))
+    second = asyncio.ensure_future(server._fetch_once("fetch", "https://example.com/", handler))
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await first == ["page"]
+    assert await second == ["page"]
+    assert calls == ["https://example.com/"]
+    assert server._inflight == {}
+
+
+async def test_fetch_once_keeps_tools_apart():
+    async def first(url, client):
+        return ["first"], True
+
+    async def second(url, client):
+        return ["second"], True
+
+    assert await server._fetch_once("a", "https://example.com/", first) == ["first"]
+    assert await server._fetch_once("b", "https://example.com/", second) == ["second"]
+    assert server._url_cache[("a", "https://example.com/")] == ["first"]
+    assert server._url_cache[("b", "https://example.com/")] == ["second"]
+
+
+async def test_fetch_once_survives_cancelled_first_caller():
+    release = asyncio.Event()
+
+    async def handler(url, client):
+        await release.wait()
+        return ["page"], False
+
+    first = asyncio.ensure_future(server._fetch_once("fetch", "https://example.com/", handler))
+    await asyncio.sleep(0)
+    second = asyncio.ensure_future(server._fetch_once("fetch", "https://example.com/", handler))
+    await asyncio.sleep(0)
+    first.cancel()
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await second == ["page"]
+    assert first.cancelled()
+
+
+@pytest.fixture
+def counted(serve):
+    """Serves a fixed page and records every request the shared client sends."""
+
+    def install(headers=None):
+        requests = []
+
+        def handler(request):
+            requests.append(request)
+            return httpx.Response(200, text="page", headers=headers)
+
+        serve(handler)
+        return requests
+
+    return install
+
+
+async def test_call_tool_serves_repeat_calls_from_cache(counted):
+    requests = counted()
+    arguments = {"url": "http://public.example/"}
+
+    first = await server._call_tool("fetch", arguments)
+    second = await server._call_tool("fetch", arguments)
+
+    assert second == first
+    assert len(requests) == 1
+
+
+async def test_call_tool_force_refresh_bypasses_cache(counted):
+    requests = counted()
+
+    await server._call_tool("fetch", {"url": "http://public.example/"})
+    await server._call_tool(
+        "fetch", {"url": "http://public.example/", "force_refresh": True}
+    )
+
+    assert len(requests) == 2
+
+
+async def test_call_tool_does_not_cache_no_store_responses(counted):
+    requests = counted(headers={"Cache-Control": "private, No-Store"})
+    arguments = {"url": "http://public.example/"}
+
+    await server._call_tool("fetch", arguments)
+    await server._call_tool("fetch", arguments)
+
+    assert len(requests) == 2
+    assert len(server._url_cache) == 0
+
+
+async def test_cache_is_bounded_by_content_size(monkeypatch):
+    cache = server.TTLCache(maxsize=10, ttl=300, getsizeof=server._content_size)
+    monkeypatch.setattr(server, "_url_cache", cache)
+
+    for url in ("https://example.com/a", "https://example.com/b", "https://example.com/c"):
+        cache[("fetch", url)] = [server.types.TextContent(type="text", text="x" * 4)]
+
+    assert list(cache) == [
+        ("fetch", "https://example.com/b"),
+        ("fetch", "https://example.com/c"),
+    ]
+    assert cache.currsize == 8
+
+
+@pytest.mark.parametrize(
+    "args",
+    [
+        ["--transport", "sse", "--ssl-keyfile", "key.pem"],
+        ["--transport", "sse", "--ssl-certfile", "cert.pem"],
+        ["--ssl-keyfile", "key.pem", "--ssl-certfile", "cert.pem"],
+    ],
+)
+async def test_main_rejects_misused_tls_options(args):
+    result = CliRunner().invoke(server.main, args)
+
+    assert result.exit_code == 2
+    assert "--ssl-keyfile and --ssl-certfile" in result.output